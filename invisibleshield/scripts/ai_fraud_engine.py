@@ -13,17 +13,24 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 import joblib
 import logging
+from drift_monitor import DriftMonitor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class FraudDetectionEngine:
-    def __init__(self):
+    def __init__(self, drift_check_interval=10000, retrain_on_drift=True):
         self.isolation_forest = IsolationForest(contamination=0.1, random_state=42)
         self.random_forest = RandomForestClassifier(n_estimators=100, random_state=42)
         self.scaler = StandardScaler()
         self.is_trained = False
+        self.drift_monitor = None
+        # Scored transactions between automatic drift checks (None disables them)
+        self.drift_check_interval = drift_check_interval
+        self.retrain_on_drift = retrain_on_drift
+        self.last_drift_report = None
+        self._scored_since_drift_check = 0
         self.feature_columns = [
             'amount', 'hour_of_day', 'day_of_week', 'transaction_frequency',
             'avg_amount_last_30d', 'location_risk_score', 'device_trust_score',
@@ -130,6 +137,12 @@ class FraudDetectionEngine:
         logger.info("Random Forest Results:")
         logger.info(f"\n{classification_report(y_test, rf_pred)}")
         
+        # Capture feature/score distributions as the drift reference. Scores come from
+        # held-out rows: in-sample forest probabilities are pushed toward 0/1 and would
+        # make live traffic from the same distribution look drifted.
+        test_scores, _, _, _ = self._score_batch(X_test_scaled)
+        self.drift_monitor = DriftMonitor.from_reference(X_train, self.feature_columns, scores=test_scores)
+        
         self.is_trained = True
         
         # Save models
@@ -143,50 +156,115 @@ class FraudDetectionEngine:
     
     def predict_fraud(self, transaction_features):
         """Predict fraud probability for a transaction"""
+        return self.predict_fraud_batch([transaction_features])[0]
+    
+    def predict_fraud_batch(self, transactions):
+        """Predict fraud probabilities for a batch of transactions in one vectorized pass"""
         if not self.is_trained:
             logger.warning("Models not trained. Loading saved models...")
             self.load_models()
         
+        transactions = list(transactions)
+        if not transactions:
+            return []
+        
         # Prepare features
-        features_df = pd.DataFrame([transaction_features])
+        features_df = pd.DataFrame(transactions)
         features_scaled = self.scaler.transform(features_df[self.feature_columns])
         
+        combined_scores, is_anomaly, normalized_iso_scores, rf_fraud_probs = self._score_batch(features_scaled)
+        
+        # Track live feature/score distributions for drift detection
+        if self.drift_monitor is not None:
+            self.drift_monitor.update(features_df, combined_scores)
+        
+        predictions = [
+            {
+                'fraud_probability': float(combined_score),
+                'risk_level': self._get_risk_level(combined_score),
+                'is_anomaly': bool(anomaly),
+                'anomaly_score': float(iso_score),
+                'classification_score': float(rf_fraud_prob),
+                'recommendation': self._get_recommendation(combined_score),
+                'confidence': float(max(abs(rf_fraud_prob - 0.5) * 2, 0.6))
+            }
+            for combined_score, anomaly, iso_score, rf_fraud_prob
+            in zip(combined_scores, is_anomaly, normalized_iso_scores, rf_fraud_probs)
+        ]
+        
+        self._scored_since_drift_check += len(predictions)
+        if self.drift_check_interval and self._scored_since_drift_check >= self.drift_check_interval:
+            self._periodic_drift_check()
+        
+        return predictions
+    
+    def _score_batch(self, features_scaled):
+        """Compute ensemble scores for already-scaled features"""
         # Get predictions from both models
-        iso_anomaly = self.isolation_forest.predict(features_scaled)[0]
-        iso_score = self.isolation_forest.decision_function(features_scaled)[0]
+        iso_anomaly = self.isolation_forest.predict(features_scaled)
+        iso_score = self.isolation_forest.decision_function(features_scaled)
         
-        rf_fraud_prob = self.random_forest.predict_proba(features_scaled)[0][1]
-        rf_prediction = self.random_forest.predict(features_scaled)[0]
+        rf_fraud_prob = self.random_forest.predict_proba(features_scaled)[:, 1]
         
         # Combine predictions (ensemble approach)
         anomaly_weight = 0.3
         classification_weight = 0.7
         
         # Normalize isolation forest score to 0-1 range
-        normalized_iso_score = max(0, min(1, (0.5 - iso_score) * 2))
+        normalized_iso_score = np.clip((0.5 - iso_score) * 2, 0, 1)
         
         combined_score = (anomaly_weight * normalized_iso_score + 
                          classification_weight * rf_fraud_prob)
         
-        # Determine risk level
-        if combined_score >= 0.8:
-            risk_level = "CRITICAL"
-        elif combined_score >= 0.6:
-            risk_level = "HIGH"
-        elif combined_score >= 0.4:
-            risk_level = "MEDIUM"
-        else:
-            risk_level = "LOW"
+        return combined_score, iso_anomaly == -1, normalized_iso_score, rf_fraud_prob
+    
+    def check_drift(self, retrain=False, reset_window=True):
+        """Compare live traffic against the training reference and optionally retrain on drift
         
-        return {
-            'fraud_probability': float(combined_score),
-            'risk_level': risk_level,
-            'is_anomaly': iso_anomaly == -1,
-            'anomaly_score': float(normalized_iso_score),
-            'classification_score': float(rf_fraud_prob),
-            'recommendation': self._get_recommendation(combined_score),
-            'confidence': float(max(abs(rf_fraud_prob - 0.5) * 2, 0.6))
-        }
+        Each report covers the traffic seen since the previous completed
+        window unless reset_window is False, so a sudden shift is not diluted
+        by weeks of normal history. A window is only closed once it holds
+        min_samples transactions; smaller windows keep accumulating. Note that train_models() regenerates the same seeded
+        synthetic data, so retraining currently reproduces an identical model
+        and reference; it only becomes meaningful once training uses real
+        labelled traffic.
+        """
+        if self.drift_monitor is None:
+            logger.warning("No drift reference available. Train models first.")
+            return {'drift_detected': False, 'retrained': False}
+        
+        report = self.drift_monitor.drift_report()
+        report['retrained'] = False
+        if reset_window and report['window_complete']:
+            self.drift_monitor.reset()
+        
+        if report['drift_detected']:
+            logger.warning(f"Drift detected in {report['drifted_columns']}")
+            if retrain:
+                report['training_results'] = self.train_models()
+                report['retrained'] = True
+        
+        return report
+    
+    def _periodic_drift_check(self):
+        """Drift check run from the scoring path every drift_check_interval transactions"""
+        self._scored_since_drift_check = 0
+        try:
+            self.last_drift_report = self.check_drift(retrain=self.retrain_on_drift)
+        except Exception as e:
+            # A failed retrain must not take down scoring; keep serving the current models
+            logger.error(f"Periodic drift check failed: {e}")
+    
+    def _get_risk_level(self, score):
+        """Get risk level based on fraud score"""
+        if score >= 0.8:
+            return "CRITICAL"
+        elif score >= 0.6:
+            return "HIGH"
+        elif score >= 0.4:
+            return "MEDIUM"
+        else:
+            return "LOW"
     
     def _get_recommendation(self, score):
         """Get action recommendation based on fraud score"""
@@ -204,6 +282,7 @@ class FraudDetectionEngine:
         joblib.dump(self.isolation_forest, 'models/isolation_forest.pkl')
         joblib.dump(self.random_forest, 'models/random_forest.pkl')
         joblib.dump(self.scaler, 'models/scaler.pkl')
+        joblib.dump(self.drift_monitor, 'models/drift_monitor.pkl')
         logger.info("Models saved successfully")
     
     def load_models(self):
@@ -217,6 +296,13 @@ class FraudDetectionEngine:
         except FileNotFoundError:
             logger.error("Model files not found. Please train models first.")
             self.train_models()
+            return
+        
+        try:
+            self.drift_monitor = joblib.load('models/drift_monitor.pkl')
+        except FileNotFoundError:
+            logger.warning("Drift reference not found. Drift monitoring disabled until retraining.")
+            self.drift_monitor = None
 
 # Initialize and train the fraud detection engine
 if __name__ == "__main__":
@@ -240,3 +326,7 @@ if __name__ == "__main__":
     
     prediction = engine.predict_fraud(sample_transaction)
     print(f"Fraud prediction: {prediction}")
+
+    # Check live traffic against the training reference
+    drift_report = engine.check_drift(retrain=False)
+    print(f"Drift detected: {drift_report['drift_detected']}")
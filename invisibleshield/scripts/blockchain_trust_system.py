@@ -13,11 +13,18 @@ from dataclasses import dataclass, asdict
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 import sqlite3
+import threading
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Indicators that record a required verification step rather than evidence of fraud.
+# They are kept on the ledger but do not reduce the trust score.
+VERIFICATION_REQUIREMENT_INDICATORS = frozenset({
+    'block_recommended', 'step_up_required', 'manual_review_required'
+})
+
 @dataclass
 class Transaction:
     transaction_id: str
@@ -54,6 +61,11 @@ class TrustPassportSystem:
         self.difficulty = 4  # Mining difficulty
         self.mining_reward = 10
         
+        # Guards pending_transactions and customer_trust_scores; mining is serialized separately
+        # so proof of work does not block new transactions
+        self._lock = threading.RLock()
+        self._mining_lock = threading.Lock()
+        
         # Initialize database
         self._init_database()
         
@@ -84,6 +96,9 @@ class TrustPassportSystem:
             )
         ''')
         
+        # Lets consumers such as the archive exporter walk the chain by hash link
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_blocks_previous_hash ON blocks (previous_hash)')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS customer_trust (
                 customer_id TEXT PRIMARY KEY,
@@ -182,14 +197,53 @@ class TrustPassportSystem:
     
     def add_transaction(self, transaction_data: Dict) -> str:
         """Add a new transaction to the pending pool"""
+        with self._lock:
+            transaction = self._create_transaction(transaction_data)
+            
+            self.pending_transactions.append(transaction)
+            
+            # Update trust score
+            self._update_customer_trust_score(transaction.customer_id, transaction.trust_score_after, transaction.transaction_id)
+        
+        logger.info(f"Transaction {transaction.transaction_id} added to pending pool")
+        return transaction.transaction_id
+    
+    def add_transactions(self, transactions_data: List[Dict]) -> List[str]:
+        """Add a batch of transactions to the pending pool with a single database write"""
+        transactions = []
+        trust_updates = []
+        # Scores updated within this batch; applied to customer_trust_scores only after the write succeeds
+        batch_scores: Dict[str, int] = {}
+        
+        with self._lock:
+            for transaction_data in transactions_data:
+                customer_id = transaction_data['customer_id']
+                current_trust_score = batch_scores.get(customer_id, self.get_customer_trust_score(customer_id))
+                transaction = self._create_transaction(transaction_data, current_trust_score)
+                transactions.append(transaction)
+                
+                batch_scores[customer_id] = transaction.trust_score_after
+                trust_updates.append((transaction.customer_id, transaction.trust_score_before,
+                                      transaction.trust_score_after, transaction.transaction_id))
+            
+            self._save_trust_updates(trust_updates)
+            self.customer_trust_scores.update(batch_scores)
+            self.pending_transactions.extend(transactions)
+        
+        logger.info(f"{len(transactions)} transactions added to pending pool")
+        return [transaction.transaction_id for transaction in transactions]
+    
+    def _create_transaction(self, transaction_data: Dict, current_trust_score: Optional[int] = None) -> Transaction:
+        """Build a ledger transaction with before/after trust scores"""
         # Get current trust score
         customer_id = transaction_data['customer_id']
-        current_trust_score = self.get_customer_trust_score(customer_id)
+        if current_trust_score is None:
+            current_trust_score = self.get_customer_trust_score(customer_id)
         
         # Calculate new trust score based on transaction
-        new_trust_score = self._calculate_new_trust_score(customer_id, transaction_data)
+        new_trust_score = self._calculate_new_trust_score(customer_id, transaction_data, current_trust_score)
         
-        transaction = Transaction(
+        return Transaction(
             transaction_id=str(uuid.uuid4()),
             customer_id=customer_id,
             timestamp=datetime.now().isoformat(),
@@ -200,56 +254,53 @@ class TrustPassportSystem:
             device_fingerprint=transaction_data.get('device_fingerprint', 'UNKNOWN'),
             trust_score_before=current_trust_score,
             trust_score_after=new_trust_score,
-            fraud_indicators=transaction_data.get('fraud_indicators', []),
+            fraud_indicators=list(transaction_data.get('fraud_indicators') or []),
             verification_method=transaction_data.get('verification_method', 'STANDARD')
         )
-        
-        self.pending_transactions.append(transaction)
-        
-        # Update trust score
-        self._update_customer_trust_score(customer_id, new_trust_score, transaction.transaction_id)
-        
-        logger.info(f"Transaction {transaction.transaction_id} added to pending pool")
-        return transaction.transaction_id
     
     def mine_block(self, miner_id: str = "SYSTEM") -> Optional[TrustBlock]:
         """Mine a new block with pending transactions"""
-        if not self.pending_transactions:
-            return None
-        
-        # Get previous block hash
-        previous_hash = self.blockchain[-1].block_hash if self.blockchain else "0" * 64
-        
-        # Create new block
-        new_block = TrustBlock(
-            block_id=str(uuid.uuid4()),
-            previous_hash=previous_hash,
-            timestamp=datetime.now().isoformat(),
-            transactions=self.pending_transactions.copy(),
-            merkle_root=self._calculate_merkle_root(self.pending_transactions),
-            nonce=0,
-            difficulty=self.difficulty,
-            miner_id=miner_id,
-            block_hash=""
-        )
-        
-        # Mine the block (proof of work)
-        start_time = time.time()
-        while True:
-            block_hash = self._calculate_block_hash(new_block)
-            if block_hash.startswith("0" * self.difficulty):
-                new_block.block_hash = block_hash
-                break
-            new_block.nonce += 1
-        
-        mining_time = time.time() - start_time
-        
-        # Add block to blockchain
-        self.blockchain.append(new_block)
-        self._save_block_to_db(new_block)
-        
-        # Clear pending transactions
-        self.pending_transactions.clear()
+        with self._mining_lock:
+            # Snapshot the pending pool; transactions added while mining stay pending for the next block
+            with self._lock:
+                block_transactions = self.pending_transactions.copy()
+            if not block_transactions:
+                return None
+            
+            # Get previous block hash
+            previous_hash = self.blockchain[-1].block_hash if self.blockchain else "0" * 64
+            
+            # Create new block
+            new_block = TrustBlock(
+                block_id=str(uuid.uuid4()),
+                previous_hash=previous_hash,
+                timestamp=datetime.now().isoformat(),
+                transactions=block_transactions,
+                merkle_root=self._calculate_merkle_root(block_transactions),
+                nonce=0,
+                difficulty=self.difficulty,
+                miner_id=miner_id,
+                block_hash=""
+            )
+            
+            # Mine the block (proof of work)
+            start_time = time.time()
+            while True:
+                block_hash = self._calculate_block_hash(new_block)
+                if block_hash.startswith("0" * self.difficulty):
+                    new_block.block_hash = block_hash
+                    break
+                new_block.nonce += 1
+            
+            mining_time = time.time() - start_time
+            
+            with self._lock:
+                # Add block to blockchain
+                self._save_block_to_db(new_block)
+                self.blockchain.append(new_block)
+                
+                # Remove the mined transactions; new ones are only ever appended after them
+                del self.pending_transactions[:len(block_transactions)]
         
         logger.info(f"Block {new_block.block_id} mined in {mining_time:.2f} seconds with nonce {new_block.nonce}")
         return new_block
@@ -308,9 +359,11 @@ class TrustPassportSystem:
         logger.info("Blockchain integrity verified successfully")
         return True
     
-    def _calculate_new_trust_score(self, customer_id: str, transaction_data: Dict) -> int:
+    def _calculate_new_trust_score(self, customer_id: str, transaction_data: Dict,
+                                   current_score: Optional[int] = None) -> int:
         """Calculate new trust score based on transaction behavior"""
-        current_score = self.get_customer_trust_score(customer_id)
+        if current_score is None:
+            current_score = self.get_customer_trust_score(customer_id)
         
         # Factors that affect trust score
         score_change = 0
@@ -325,8 +378,9 @@ class TrustPassportSystem:
             score_change += 1  # Normal transaction
         
         # Fraud indicators
-        fraud_indicators = transaction_data.get('fraud_indicators', [])
-        score_change -= len(fraud_indicators) * 5
+        fraud_indicators = transaction_data.get('fraud_indicators') or []
+        score_change -= sum(1 for indicator in fraud_indicators
+                            if indicator not in VERIFICATION_REQUIREMENT_INDICATORS) * 5
         
         # Verification method
         verification = transaction_data.get('verification_method', 'STANDARD')
@@ -351,24 +405,34 @@ class TrustPassportSystem:
         old_score = self.get_customer_trust_score(customer_id)
         self.customer_trust_scores[customer_id] = new_score
         
+        self._save_trust_updates([(customer_id, old_score, new_score, transaction_id)])
+    
+    def _save_trust_updates(self, trust_updates: List[tuple]):
+        """Persist (customer_id, old_score, new_score, transaction_id) updates in one database transaction"""
+        if not trust_updates:
+            return
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
+        now = datetime.now().isoformat()
         
         # Update or insert customer trust record
-        cursor.execute('''
+        cursor.executemany('''
             INSERT OR REPLACE INTO customer_trust 
             (customer_id, trust_score, last_updated, transaction_count, fraud_incidents, verification_level)
             VALUES (?, ?, ?, 
                     COALESCE((SELECT transaction_count FROM customer_trust WHERE customer_id = ?), 0) + 1,
                     COALESCE((SELECT fraud_incidents FROM customer_trust WHERE customer_id = ?), 0),
                     'STANDARD')
-        ''', (customer_id, new_score, datetime.now().isoformat(), customer_id, customer_id))
+        ''', [(customer_id, new_score, now, customer_id, customer_id)
+              for customer_id, _, new_score, _ in trust_updates])
         
         # Add to trust history
-        cursor.execute('''
+        cursor.executemany('''
             INSERT INTO trust_history (customer_id, old_score, new_score, change_reason, timestamp, transaction_id)
             VALUES (?, ?, ?, ?, ?, ?)
-        ''', (customer_id, old_score, new_score, 'Transaction behavior', datetime.now().isoformat(), transaction_id))
+        ''', [(customer_id, old_score, new_score, 'Transaction behavior', now, transaction_id)
+              for customer_id, old_score, new_score, transaction_id in trust_updates])
         
         conn.commit()
         conn.close()
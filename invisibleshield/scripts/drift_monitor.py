@@ -0,0 +1,202 @@
+"""
+Streaming Drift Monitor - Feature and score distribution monitoring
+Keeps fixed-memory, mergeable quantile sketches of live traffic and compares
+them against the training reference using PSI and KS statistics
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMN = 'fraud_probability'
+
+
+class QuantileSketch:
+    """Histogram over fixed bucket edges taken from reference quantiles.
+
+    Memory is bounded by the number of edges, updates are a single
+    searchsorted/bincount pass per batch, and two sketches built on the same
+    edges merge by adding their counts.
+    """
+
+    def __init__(self, edges: np.ndarray):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.total = 0
+        self.min_value = np.inf
+        self.max_value = -np.inf
+
+    @classmethod
+    def from_reference(cls, values, num_bins: int = 50) -> 'QuantileSketch':
+        """Build a sketch whose edges are the reference quantiles, pre-filled with the reference"""
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            raise ValueError("Reference values must contain at least one finite value")
+
+        # Discrete features (e.g. failed attempts) repeat quantiles, so collapse duplicates
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, num_bins + 1)[1:-1]))
+        sketch = cls(edges)
+        sketch.update(values)
+        return sketch
+
+    def empty_copy(self) -> 'QuantileSketch':
+        """Create an empty sketch sharing this sketch's bucket edges"""
+        return QuantileSketch(self.edges)
+
+    def update(self, values):
+        """Add a batch of values to the sketch"""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+
+        buckets = np.searchsorted(self.edges, values, side='right')
+        self.counts += np.bincount(buckets, minlength=len(self.counts))
+        self.total += int(values.size)
+        self.min_value = min(self.min_value, float(values.min()))
+        self.max_value = max(self.max_value, float(values.max()))
+
+    def merge(self, other: 'QuantileSketch'):
+        """Merge another sketch built on the same edges into this one"""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge sketches with different bucket edges")
+
+        self.counts += other.counts
+        self.total += other.total
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+
+    def cdf(self) -> np.ndarray:
+        """Cumulative fraction of values at the end of each bucket"""
+        if self.total == 0:
+            return np.zeros(len(self.counts))
+        return np.cumsum(self.counts) / self.total
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile, resolved to the lower edge of the containing bucket"""
+        if self.total == 0:
+            return float('nan')
+
+        bucket = min(int(np.searchsorted(self.cdf(), q, side='left')), len(self.edges))
+        if bucket == 0:
+            return float(self.min_value)
+        return float(self.edges[bucket - 1])
+
+    def psi(self, reference: 'QuantileSketch', num_groups: int = 10, epsilon: float = 1e-4) -> float:
+        """Population Stability Index against a reference sketch on the same edges"""
+        if not np.array_equal(self.edges, reference.edges):
+            raise ValueError("PSI requires sketches with identical bucket edges")
+        if self.total == 0 or reference.total == 0:
+            return 0.0
+
+        # Coarsen fine buckets into roughly equal-mass reference groups (deciles by default)
+        ref_cdf = reference.cdf()
+        bucket_start_mass = np.concatenate(([0.0], ref_cdf[:-1]))
+        groups = np.minimum((bucket_start_mass * num_groups).astype(int), num_groups - 1)
+
+        expected = np.bincount(groups, weights=reference.counts, minlength=num_groups) / reference.total
+        actual = np.bincount(groups, weights=self.counts, minlength=num_groups) / self.total
+
+        used = (expected > 0) | (actual > 0)
+        expected = np.maximum(expected[used], epsilon)
+        actual = np.maximum(actual[used], epsilon)
+        return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+    def ks(self, reference: 'QuantileSketch') -> float:
+        """Kolmogorov-Smirnov distance evaluated at the shared bucket edges"""
+        if not np.array_equal(self.edges, reference.edges):
+            raise ValueError("KS requires sketches with identical bucket edges")
+        if self.total == 0 or reference.total == 0:
+            return 0.0
+        return float(np.max(np.abs(self.cdf() - reference.cdf())))
+
+
+class DriftMonitor:
+    """Tracks live feature and score distributions against the training reference.
+
+    One sketch pair (reference, live) is kept per feature column plus one for
+    the ensemble fraud probability. Monitors from different worker processes
+    can be combined with ``merge`` before calling ``drift_report``.
+    """
+
+    def __init__(self, reference_sketches: Dict[str, QuantileSketch],
+                 psi_threshold: float = 0.2, ks_threshold: float = 0.1,
+                 min_samples: int = 500):
+        self.reference_sketches = reference_sketches
+        self.live_sketches = {name: sketch.empty_copy() for name, sketch in reference_sketches.items()}
+        self.psi_threshold = psi_threshold
+        self.ks_threshold = ks_threshold
+        self.min_samples = min_samples
+
+    @classmethod
+    def from_reference(cls, features_df: pd.DataFrame, feature_columns: List[str],
+                       scores=None, num_bins: int = 50, **kwargs) -> 'DriftMonitor':
+        """Build a monitor from training features and (optionally) training scores"""
+        reference_sketches = {
+            column: QuantileSketch.from_reference(features_df[column].to_numpy(), num_bins)
+            for column in feature_columns
+        }
+        if scores is not None:
+            reference_sketches[SCORE_COLUMN] = QuantileSketch.from_reference(scores, num_bins)
+        return cls(reference_sketches, **kwargs)
+
+    @property
+    def feature_columns(self) -> List[str]:
+        return [name for name in self.reference_sketches if name != SCORE_COLUMN]
+
+    def update(self, features_df: pd.DataFrame, scores=None):
+        """Add a scored batch of live transactions to the live sketches"""
+        for column in self.feature_columns:
+            if column in features_df:
+                self.live_sketches[column].update(features_df[column].to_numpy())
+
+        if scores is not None and SCORE_COLUMN in self.live_sketches:
+            self.live_sketches[SCORE_COLUMN].update(scores)
+
+    def merge(self, other: 'DriftMonitor'):
+        """Merge live sketches from another worker's monitor into this one"""
+        if set(other.live_sketches) != set(self.live_sketches):
+            raise ValueError("Cannot merge monitors tracking different columns")
+
+        for name, sketch in other.live_sketches.items():
+            self.live_sketches[name].merge(sketch)
+
+    def reset(self):
+        """Discard live sketches to start a new monitoring window"""
+        self.live_sketches = {name: sketch.empty_copy() for name, sketch in self.reference_sketches.items()}
+
+    def drift_report(self) -> Dict:
+        """Compute PSI/KS drift metrics for every tracked column"""
+        columns = {}
+        drifted_columns = []
+
+        for name, reference in self.reference_sketches.items():
+            live = self.live_sketches[name]
+            psi = live.psi(reference)
+            ks = live.ks(reference)
+            drifted = live.total >= self.min_samples and (psi >= self.psi_threshold or ks >= self.ks_threshold)
+
+            columns[name] = {
+                'psi': psi,
+                'ks': ks,
+                'live_samples': live.total,
+                'live_median': live.quantile(0.5),
+                'reference_median': reference.quantile(0.5),
+                'drifted': drifted
+            }
+            if drifted:
+                drifted_columns.append(name)
+
+        live_samples = max((sketch.total for sketch in self.live_sketches.values()), default=0)
+        return {
+            'columns': columns,
+            'drifted_columns': drifted_columns,
+            'drift_detected': bool(drifted_columns),
+            'live_samples': live_samples,
+            'window_complete': live_samples >= self.min_samples
+        }
@@ -0,0 +1,367 @@
+"""
+Fraud Scoring to Trust Ledger Bridge
+Pipelined ingestion that scores raw transactions in batches and appends them,
+with derived fraud indicators and verification requirements, to the trust ledger
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import logging
+
+from ai_fraud_engine import FraudDetectionEngine
+from blockchain_trust_system import TrustPassportSystem, VERIFICATION_REQUIREMENT_INDICATORS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# The single fraud indicator recorded on the ledger for each model risk level
+RISK_LEVEL_INDICATORS = {
+    'CRITICAL': 'critical_fraud_risk',
+    'HIGH': 'high_fraud_risk',
+    'MEDIUM': 'elevated_fraud_risk'
+}
+
+# Verification requirement tag for each model recommendation. These tags are in
+# VERIFICATION_REQUIREMENT_INDICATORS, so the ledger does not penalize trust for them;
+# verification_method is left untouched as it records the check actually performed.
+RECOMMENDATION_REQUIREMENTS = {
+    'BLOCK_TRANSACTION': 'block_recommended',
+    'REQUIRE_ADDITIONAL_VERIFICATION': 'step_up_required',
+    'FLAG_FOR_REVIEW': 'manual_review_required'
+}
+assert set(RECOMMENDATION_REQUIREMENTS.values()) <= VERIFICATION_REQUIREMENT_INDICATORS
+
+# Ledger fields a raw transaction must carry in addition to the model features
+REQUIRED_LEDGER_FIELDS = ['customer_id']
+
+_STOP = object()
+
+
+def map_prediction_to_ledger(raw_transaction: Dict, prediction: Dict) -> Dict:
+    """Merge a fraud prediction into a raw transaction as ledger fraud indicators.
+
+    One model score yields at most one penalized risk indicator plus one
+    unpenalized verification requirement tag.
+    """
+    fraud_indicators = list(raw_transaction.get('fraud_indicators') or [])
+    for tag in (RISK_LEVEL_INDICATORS.get(prediction['risk_level']),
+                RECOMMENDATION_REQUIREMENTS.get(prediction['recommendation'])):
+        if tag is not None:
+            fraud_indicators.append(tag)
+
+    ledger_transaction = dict(raw_transaction)
+    # Keep caller-supplied indicators first and drop duplicates
+    ledger_transaction['fraud_indicators'] = list(dict.fromkeys(fraud_indicators))
+    return ledger_transaction
+
+
+class StageTimer:
+    """Bounded latency samples for one pipeline stage"""
+
+    def __init__(self, max_samples: int = 10000):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total_seconds = 0.0
+
+    def record(self, seconds: float, count: int = 1):
+        self.samples.extend([seconds] * count)
+        self.count += count
+        self.total_seconds += seconds * count
+
+    def summary(self) -> Dict:
+        if not self.samples:
+            return {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+
+        samples_ms = np.asarray(self.samples) * 1000
+        return {
+            'count': self.count,
+            'mean_ms': float(self.total_seconds / self.count * 1000),
+            'p50_ms': float(np.percentile(samples_ms, 50)),
+            'p95_ms': float(np.percentile(samples_ms, 95)),
+            'max_ms': float(samples_ms.max())
+        }
+
+
+class FraudLedgerBridge:
+    """Two-stage pipeline: batch scoring feeds bulk ledger writes through bounded queues.
+
+    ``submit`` blocks when the scoring queue is full, so a slow ledger applies
+    backpressure all the way to the producer instead of buffering unboundedly.
+    Scoring of batch N+1 overlaps with the ledger write of batch N.
+
+    If a stage fails unexpectedly it keeps draining its input (rejecting what
+    it drains) and still forwards the stop signal, so ``close`` never hangs;
+    the first worker error is re-raised from ``close``.
+    """
+
+    def __init__(self, engine: FraudDetectionEngine, trust_system: TrustPassportSystem,
+                 batch_size: int = 256, queue_size: int = 4096, flush_interval: float = 0.05,
+                 block_size: Optional[int] = None,
+                 on_reject: Optional[Callable[[Dict, str, str], None]] = None):
+        self.engine = engine
+        self.trust_system = trust_system
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_size = block_size
+        self.on_reject = on_reject
+        self.required_fields = REQUIRED_LEDGER_FIELDS + list(engine.feature_columns)
+
+        self._scoring_queue = queue.Queue(maxsize=queue_size)
+        self._ledger_queue = queue.Queue(maxsize=max(1, queue_size // batch_size))
+        self._threads: List[threading.Thread] = []
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+
+        self.transaction_ids: List[str] = []
+        self.rejected_transactions: List[Dict] = []
+        self._scoring_timer = StageTimer()
+        self._ledger_timer = StageTimer()
+        self._end_to_end_timer = StageTimer()
+        self._start_time = None
+        self._end_time = None
+
+    def start(self):
+        """Start the scoring and ledger stages"""
+        if self._threads:
+            raise RuntimeError("Bridge already started")
+
+        self._start_time = time.perf_counter()
+        self._threads = [
+            threading.Thread(target=self._scoring_stage, name='fraud-scoring', daemon=True),
+            threading.Thread(target=self._ledger_stage, name='ledger-writer', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, raw_transaction: Dict):
+        """Queue a raw transaction (ledger fields plus model features) for scoring"""
+        if self._error is not None:
+            raise RuntimeError("Bridge stopped after a worker failure") from self._error
+        self._scoring_queue.put((raw_transaction, time.perf_counter()))
+
+    def close(self) -> Dict:
+        """Drain both stages and return pipeline stats, re-raising the first worker error"""
+        self._scoring_queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._end_time = time.perf_counter()
+
+        if self._error is not None:
+            raise self._error
+        return self.get_stats()
+
+    def run(self, raw_transactions) -> Dict:
+        """Push an iterable of raw transactions through the pipeline and return stats"""
+        self.start()
+        try:
+            for raw_transaction in raw_transactions:
+                self.submit(raw_transaction)
+        finally:
+            stats = self.close()
+        return stats
+
+    def _scoring_stage(self):
+        """Run the scoring loop; on failure drain the input so producers never block"""
+        stopped = False
+        try:
+            stopped = self._scoring_loop()
+        except Exception as e:
+            self._record_error('scoring', e)
+        finally:
+            if not stopped:
+                self._drain(self._scoring_queue, 'scoring')
+            self._ledger_queue.put(_STOP)
+
+    def _scoring_loop(self) -> bool:
+        """Collect up to batch_size transactions, score them in one pass and hand off"""
+        stopping = False
+        while not stopping:
+            item = self._scoring_queue.get()
+            if item is _STOP:
+                return True
+
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._scoring_queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            # Reject malformed records up front so they cannot fail the whole batch
+            valid = []
+            for raw_transaction, submit_time in batch:
+                if not isinstance(raw_transaction, dict):
+                    self._reject(raw_transaction, 'scoring', f"Expected a dict, got {type(raw_transaction).__name__}")
+                    continue
+                missing = [field for field in self.required_fields if field not in raw_transaction]
+                if missing:
+                    self._reject(raw_transaction, 'scoring', f"Missing fields: {missing}")
+                else:
+                    valid.append((raw_transaction, submit_time))
+            if not valid:
+                continue
+
+            start_time = time.perf_counter()
+            scored = self._score(valid)
+            if scored:
+                self._scoring_timer.record(time.perf_counter() - start_time, len(scored))
+                self._ledger_queue.put((
+                    [raw_transaction for raw_transaction, _, _ in scored],
+                    [prediction for _, prediction, _ in scored],
+                    [submit_time for _, _, submit_time in scored]
+                ))
+
+        return True
+
+    def _score(self, batch: List[tuple]) -> List[tuple]:
+        """Score a batch in one pass, falling back to per-record scoring if the batch fails"""
+        raw_transactions = [raw_transaction for raw_transaction, _ in batch]
+        try:
+            predictions = self.engine.predict_fraud_batch(raw_transactions)
+            return [(raw_transaction, prediction, submit_time)
+                    for (raw_transaction, submit_time), prediction in zip(batch, predictions)]
+        except Exception as e:
+            logger.warning(f"Batch scoring failed, retrying {len(batch)} transactions individually: {e}")
+
+        scored = []
+        for raw_transaction, submit_time in batch:
+            try:
+                scored.append((raw_transaction, self.engine.predict_fraud(raw_transaction), submit_time))
+            except Exception as e:
+                self._reject(raw_transaction, 'scoring', str(e))
+        return scored
+
+    def _ledger_stage(self):
+        """Run the ledger loop; on failure drain scored batches so the scoring stage never blocks"""
+        stopped = False
+        try:
+            stopped = self._ledger_loop()
+        except Exception as e:
+            self._record_error('ledger', e)
+        finally:
+            if not stopped:
+                self._drain(self._ledger_queue, 'ledger')
+
+    def _ledger_loop(self) -> bool:
+        """Map scored batches to ledger transactions and append them in bulk"""
+        while True:
+            item = self._ledger_queue.get()
+            if item is _STOP:
+                return True
+
+            raw_transactions, predictions, submitted_at = item
+            mapped_raw, ledger_transactions, mapped_submitted_at = [], [], []
+            for raw_transaction, prediction, submit_time in zip(raw_transactions, predictions, submitted_at):
+                try:
+                    ledger_transactions.append(map_prediction_to_ledger(raw_transaction, prediction))
+                except Exception as e:
+                    self._reject(raw_transaction, 'ledger', f"Could not map prediction: {e}")
+                    continue
+                mapped_raw.append(raw_transaction)
+                mapped_submitted_at.append(submit_time)
+            if not ledger_transactions:
+                continue
+
+            start_time = time.perf_counter()
+            try:
+                self.transaction_ids.extend(self.trust_system.add_transactions(ledger_transactions))
+            except Exception as e:
+                # add_transactions is all-or-nothing, so the whole batch is rejected
+                for raw_transaction in mapped_raw:
+                    self._reject(raw_transaction, 'ledger', str(e))
+                continue
+            finished = time.perf_counter()
+            self._ledger_timer.record(finished - start_time, len(ledger_transactions))
+
+            for submit_time in mapped_submitted_at:
+                self._end_to_end_timer.record(finished - submit_time)
+
+            # Transactions are already on the ledger; a mining failure leaves them pending for the next attempt
+            if self.block_size and len(self.trust_system.pending_transactions) >= self.block_size:
+                try:
+                    self.trust_system.mine_block()
+                except Exception as e:
+                    logger.error(f"Mining failed with {len(self.trust_system.pending_transactions)} pending transactions: {e}")
+
+    def _drain(self, stage_queue: queue.Queue, stage: str):
+        """Consume and reject everything up to the stop signal after a stage failure"""
+        while True:
+            item = stage_queue.get()
+            if item is _STOP:
+                return
+            raw_transactions = [item[0]] if stage == 'scoring' else item[0]
+            for raw_transaction in raw_transactions:
+                self._reject(raw_transaction, stage, "Pipeline stage failed")
+
+    def _record_error(self, stage: str, error: BaseException):
+        logger.error(f"{stage.capitalize()} stage failed: {error}")
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+
+    def _reject(self, raw_transaction, stage: str, error: str):
+        """Record a transaction that could not be scored or written"""
+        logger.error(f"Transaction rejected at {stage} stage: {error}")
+        self.rejected_transactions.append({'transaction': raw_transaction, 'stage': stage, 'error': error})
+        if self.on_reject is not None:
+            try:
+                self.on_reject(raw_transaction, stage, error)
+            except Exception as e:
+                logger.error(f"on_reject callback failed: {e}")
+
+    def get_stats(self) -> Dict:
+        """Throughput and per-stage latency, measured per transaction over the batch it was processed in"""
+        end_time = self._end_time or time.perf_counter()
+        elapsed = end_time - self._start_time if self._start_time else 0.0
+        processed = len(self.transaction_ids)
+
+        return {
+            'processed_transactions': processed,
+            'rejected_transactions': len(self.rejected_transactions),
+            'elapsed_seconds': elapsed,
+            'throughput_tps': processed / elapsed if elapsed > 0 else 0.0,
+            'scoring_latency': self._scoring_timer.summary(),
+            'ledger_latency': self._ledger_timer.summary(),
+            'end_to_end_latency': self._end_to_end_timer.summary()
+        }
+
+
+# Run a sample batch through the bridge
+if __name__ == "__main__":
+    engine = FraudDetectionEngine()
+    trust_system = TrustPassportSystem()
+    bridge = FraudLedgerBridge(engine, trust_system, batch_size=64, block_size=500)
+
+    rng = np.random.default_rng(7)
+    raw_transactions = [
+        {
+            'customer_id': f'CUST-{rng.integers(1, 200):03d}',
+            'type': 'PURCHASE',
+            'merchant_id': f'WALMART-{rng.integers(1, 20):03d}',
+            'location': 'New York, NY',
+            'device_fingerprint': 'iOS-Safari-Trusted',
+            'amount': float(rng.lognormal(3.5, 1.2)),
+            'hour_of_day': int(rng.integers(0, 24)),
+            'day_of_week': int(rng.integers(0, 7)),
+            'transaction_frequency': float(rng.normal(15, 5)),
+            'avg_amount_last_30d': float(rng.normal(85, 25)),
+            'location_risk_score': float(rng.normal(20, 10)),
+            'device_trust_score': float(rng.normal(85, 15)),
+            'account_age_days': float(rng.exponential(365)),
+            'failed_attempts_last_24h': int(rng.poisson(0.1)),
+            'velocity_score': float(rng.normal(25, 10))
+        }
+        for _ in range(1000)
+    ]
+
+    stats = bridge.run(raw_transactions)
+    trust_system.mine_block()
+    print(f"Bridge stats: {stats}")
@@ -0,0 +1,364 @@
+"""
+Ledger Columnar Archive - Analytical export of the trust ledger
+Incrementally exports sealed blocks into NPY column sets with min/max statistics
+and serves projection/predicate-pushdown scans over them
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ARCHIVE_INDEX = 'archive_index.json'
+
+# previous_hash of the genesis block, i.e. the chain position before any block
+GENESIS_PREVIOUS_HASH = "0" * 64
+
+# Row groups store the exact value set of these columns when it has at most this many values
+DISTINCT_VALUE_COLUMNS = ['merchant_id']
+DISTINCT_VALUES_LIMIT = 64
+
+# Column name -> numpy dtype used on disk ('U' columns are stored as fixed-width unicode)
+ARCHIVE_COLUMNS = {
+    'block_height': 'int64',
+    'block_id': 'U',
+    'transaction_id': 'U',
+    'customer_id': 'U',
+    'timestamp': 'datetime64[us]',
+    'transaction_type': 'U',
+    'amount': 'float64',
+    'merchant_id': 'U',
+    'location': 'U',
+    'device_fingerprint': 'U',
+    'trust_score_before': 'int64',
+    'trust_score_after': 'int64',
+    'fraud_indicators': 'U',  # '|'-joined list, empty string when none
+    'fraud_indicator_count': 'int64',
+    'verification_method': 'U'
+}
+
+
+def _column_stats(values: np.ndarray) -> List:
+    """JSON-serializable [min, max] for a column slice"""
+    if values.size == 0:
+        return [None, None]
+    if values.dtype.kind == 'M':
+        return [str(values.min()), str(values.max())]
+    if values.dtype.kind == 'U':
+        return [min(values.tolist()), max(values.tolist())]
+    return [values.min().item(), values.max().item()]
+
+
+def _numpy_dtype(column: str):
+    dtype = ARCHIVE_COLUMNS[column]
+    return str if dtype == 'U' else dtype
+
+
+def _to_datetime64(value) -> Optional[np.datetime64]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return np.datetime64(value, 'us')
+
+
+class LedgerArchiveExporter:
+    """Writes sealed ledger blocks into columnar segments, one height range per segment.
+
+    Each segment is a directory of ``<column>.npy`` files plus a ``manifest.json``
+    holding per-row-group min/max statistics (and distinct merchant sets).
+    Rows within a segment are sorted by ``(customer_id, timestamp)`` so
+    customer predicates prune row groups. The archive index records the hash
+    of the last exported block, and ``export`` walks the chain forward through
+    ``previous_hash``. That keeps the export exact regardless of clock steps or
+    SQLite rowid renumbering (e.g. after VACUUM).
+    """
+
+    def __init__(self, db_path: str = "trust_passport.db", archive_dir: str = "ledger_archive",
+                 blocks_per_segment: int = 1000, row_group_size: int = 8192):
+        self.db_path = db_path
+        self.archive_dir = archive_dir
+        self.blocks_per_segment = blocks_per_segment
+        self.row_group_size = row_group_size
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+    def export(self, max_blocks: Optional[int] = None) -> List[Dict]:
+        """Export blocks not yet archived and return the new segment manifests"""
+        index = load_archive_index(self.archive_dir)
+        next_height = index['next_height']
+        last_block_hash = index['last_block_hash']
+        new_segments = []
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        try:
+            while max_blocks is None or next_height - index['next_height'] < max_blocks:
+                limit = self.blocks_per_segment
+                if max_blocks is not None:
+                    limit = min(limit, index['next_height'] + max_blocks - next_height)
+
+                rows = self._next_blocks(cursor, last_block_hash, limit)
+                if not rows:
+                    break
+
+                # Height is the number of blocks archived before this one
+                manifest = self._write_segment(next_height, [(block_id, transactions_json)
+                                                             for block_id, _, transactions_json in rows])
+                manifest['end_block_hash'] = rows[-1][1]
+                new_segments.append(manifest)
+                next_height += len(rows)
+                last_block_hash = rows[-1][1]
+        finally:
+            conn.close()
+
+        if new_segments:
+            index['segments'].extend(new_segments)
+            index['next_height'] = next_height
+            index['last_block_hash'] = last_block_hash
+            self._save_index(index)
+            logger.info(f"Exported {len(new_segments)} segments up to block height {next_height - 1}")
+
+        return new_segments
+
+    def _next_blocks(self, cursor, last_block_hash: str, limit: int) -> List[tuple]:
+        """Follow previous_hash links from last_block_hash for up to limit blocks"""
+        rows = []
+        while len(rows) < limit:
+            cursor.execute('''
+                SELECT block_id, block_hash, transactions_json FROM blocks
+                WHERE previous_hash = ?
+            ''', (last_block_hash,))
+            children = cursor.fetchall()
+            if not children:
+                break
+            if len(children) > 1:
+                raise ValueError(f"Ledger forks after block hash {last_block_hash}; cannot export a single chain")
+
+            rows.append(children[0])
+            last_block_hash = children[0][1]
+        return rows
+
+    def _write_segment(self, start_height: int, rows: List[tuple]) -> Dict:
+        """Write one segment of blocks as NPY column files with row group statistics"""
+        end_height = start_height + len(rows) - 1
+        segment_name = f"blocks_{start_height:010d}_{end_height:010d}"
+        segment_dir = os.path.join(self.archive_dir, segment_name)
+        os.makedirs(segment_dir, exist_ok=True)
+
+        records = {column: [] for column in ARCHIVE_COLUMNS}
+        for height, (block_id, transactions_json) in enumerate(rows, start=start_height):
+            for tx in json.loads(transactions_json):
+                records['block_height'].append(height)
+                records['block_id'].append(block_id)
+                records['fraud_indicators'].append('|'.join(tx['fraud_indicators']))
+                records['fraud_indicator_count'].append(len(tx['fraud_indicators']))
+                for column in ARCHIVE_COLUMNS:
+                    if column in tx and column != 'fraud_indicators':
+                        records[column].append(tx[column])
+
+        num_rows = len(records['block_height'])
+        columns = {column: np.array(records[column], dtype=_numpy_dtype(column)) for column in ARCHIVE_COLUMNS}
+
+        # Cluster rows by customer so customer_id min/max statistics are selective
+        order = np.lexsort((columns['timestamp'], columns['customer_id']))
+        for column in ARCHIVE_COLUMNS:
+            columns[column] = columns[column][order]
+            np.save(os.path.join(segment_dir, f"{column}.npy"), columns[column], allow_pickle=False)
+
+        row_groups = []
+        for offset in range(0, num_rows, self.row_group_size):
+            count = min(self.row_group_size, num_rows - offset)
+            distinct = {}
+            for column in DISTINCT_VALUE_COLUMNS:
+                values = np.unique(columns[column][offset:offset + count])
+                if len(values) <= DISTINCT_VALUES_LIMIT:
+                    distinct[column] = values.tolist()
+            row_groups.append({
+                'offset': offset,
+                'count': count,
+                'stats': {column: _column_stats(values[offset:offset + count])
+                          for column, values in columns.items()},
+                'distinct': distinct
+            })
+
+        manifest = {
+            'segment': segment_name,
+            'start_height': start_height,
+            'end_height': end_height,
+            'num_rows': num_rows,
+            'row_groups': row_groups
+        }
+        with open(os.path.join(segment_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+
+        return manifest
+
+    def _save_index(self, index: Dict):
+        """Atomically replace the archive index"""
+        index_path = os.path.join(self.archive_dir, ARCHIVE_INDEX)
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+
+
+def load_archive_index(archive_dir: str) -> Dict:
+    """Load the archive index, or an empty one for a new archive"""
+    try:
+        with open(os.path.join(archive_dir, ARCHIVE_INDEX)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'next_height': 0, 'last_block_hash': GENESIS_PREVIOUS_HASH, 'segments': []}
+
+
+class LedgerArchive:
+    """Read-only query API over an exported ledger archive.
+
+    Scans skip segments and row groups whose min/max statistics cannot match
+    the predicates, and memory-map only the columns that are projected or
+    filtered on.
+    """
+
+    def __init__(self, archive_dir: str = "ledger_archive"):
+        self.archive_dir = archive_dir
+        self.last_scan_stats: Dict = {}
+
+    def scan(self, columns: Optional[List[str]] = None, start_time=None, end_time=None,
+             customer_id: Optional[str] = None, merchant_id: Optional[str] = None,
+             min_height: Optional[int] = None, max_height: Optional[int] = None) -> pd.DataFrame:
+        """Return the projected columns of transactions matching all given predicates.
+
+        ``start_time`` is inclusive and ``end_time`` exclusive; both accept
+        datetimes or ISO strings.
+        """
+        columns = list(columns) if columns is not None else list(ARCHIVE_COLUMNS)
+        unknown = [column for column in columns if column not in ARCHIVE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown archive columns: {unknown}")
+
+        start_time = _to_datetime64(start_time)
+        end_time = _to_datetime64(end_time)
+
+        predicate_columns = []
+        if start_time is not None or end_time is not None:
+            predicate_columns.append('timestamp')
+        if customer_id is not None:
+            predicate_columns.append('customer_id')
+        if merchant_id is not None:
+            predicate_columns.append('merchant_id')
+
+        index = load_archive_index(self.archive_dir)
+        stats = {'segments_total': len(index['segments']), 'segments_read': 0,
+                 'row_groups_read': 0, 'rows_read': 0, 'rows_matched': 0}
+        parts = {column: [] for column in columns}
+
+        for segment in index['segments']:
+            if min_height is not None and segment['end_height'] < min_height:
+                continue
+            if max_height is not None and segment['start_height'] > max_height:
+                continue
+
+            row_groups = [
+                row_group for row_group in segment['row_groups']
+                if self._row_group_may_match(row_group, start_time, end_time, customer_id, merchant_id,
+                                             min_height, max_height)
+            ]
+            if not row_groups:
+                continue
+
+            stats['segments_read'] += 1
+            segment_dir = os.path.join(self.archive_dir, segment['segment'])
+            loaded = {}
+
+            def column_data(column):
+                # Memory-map lazily so unreferenced columns are never opened
+                if column not in loaded:
+                    loaded[column] = np.load(os.path.join(segment_dir, f"{column}.npy"), mmap_mode='r')
+                return loaded[column]
+
+            for row_group in row_groups:
+                rows = slice(row_group['offset'], row_group['offset'] + row_group['count'])
+                stats['row_groups_read'] += 1
+                stats['rows_read'] += row_group['count']
+
+                mask = np.ones(row_group['count'], dtype=bool)
+                if min_height is not None or max_height is not None:
+                    heights = column_data('block_height')[rows]
+                    if min_height is not None:
+                        mask &= heights >= min_height
+                    if max_height is not None:
+                        mask &= heights <= max_height
+                if 'timestamp' in predicate_columns:
+                    timestamps = column_data('timestamp')[rows]
+                    if start_time is not None:
+                        mask &= timestamps >= start_time
+                    if end_time is not None:
+                        mask &= timestamps < end_time
+                if customer_id is not None:
+                    mask &= column_data('customer_id')[rows] == customer_id
+                if merchant_id is not None:
+                    mask &= column_data('merchant_id')[rows] == merchant_id
+
+                if not mask.any():
+                    continue
+
+                stats['rows_matched'] += int(mask.sum())
+                for column in columns:
+                    parts[column].append(np.asarray(column_data(column)[rows][mask]))
+
+        self.last_scan_stats = stats
+        return pd.DataFrame({
+            column: np.concatenate(values) if values else np.array([], dtype=_numpy_dtype(column))
+            for column, values in parts.items()
+        })
+
+    @staticmethod
+    def _row_group_may_match(row_group: Dict, start_time, end_time, customer_id, merchant_id,
+                             min_height, max_height) -> bool:
+        """Check predicates against row group min/max statistics and distinct value sets"""
+        stats = row_group['stats']
+        time_min, time_max = stats['timestamp']
+        if time_min is None:
+            return False
+        height_min, height_max = stats['block_height']
+        if min_height is not None and height_max < min_height:
+            return False
+        if max_height is not None and height_min > max_height:
+            return False
+        if start_time is not None and np.datetime64(time_max, 'us') < start_time:
+            return False
+        if end_time is not None and np.datetime64(time_min, 'us') >= end_time:
+            return False
+
+        for column, value in (('customer_id', customer_id), ('merchant_id', merchant_id)):
+            if value is None:
+                continue
+            column_min, column_max = stats[column]
+            if value < column_min or value > column_max:
+                return False
+            distinct = row_group.get('distinct', {}).get(column)
+            if distinct is not None and value not in distinct:
+                return False
+
+        return True
+
+
+# Export the local ledger and run a sample analytical query
+if __name__ == "__main__":
+    exporter = LedgerArchiveExporter()
+    segments = exporter.export()
+    print(f"Exported {len(segments)} new segments")
+
+    archive = LedgerArchive()
+    df = archive.scan(columns=['merchant_id', 'amount', 'fraud_indicator_count'])
+    summary = df.groupby('merchant_id').agg(total_amount=('amount', 'sum'),
+                                            fraud_indicators=('fraud_indicator_count', 'sum'))
+    print(summary)
+    print(f"Scan stats: {archive.last_scan_stats}")
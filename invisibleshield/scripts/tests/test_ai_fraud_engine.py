@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai_fraud_engine import FraudDetectionEngine
+
+
+def synthetic_training_data(self, num_samples=10000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({column: rng.normal(50, 10, num_samples) for column in self.feature_columns})
+    df['is_fraud'] = (rng.random(num_samples) < 0.1).astype(int)
+    df.loc[df['is_fraud'] == 1, 'velocity_score'] += 30
+    return df
+
+
+def live_transactions(engine, size, seed, amount_shift=0.0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({column: rng.normal(50, 10, size) for column in engine.feature_columns})
+    df['amount'] += amount_shift
+    return df.to_dict('records')
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'models').mkdir()
+    monkeypatch.setattr(FraudDetectionEngine, 'generate_training_data', synthetic_training_data)
+    engine = FraudDetectionEngine(drift_check_interval=None, retrain_on_drift=False)
+    engine.train_models()
+    return engine
+
+
+def test_predict_fraud_batch_empty(engine):
+    assert engine.predict_fraud_batch([]) == []
+
+
+def test_predict_fraud_matches_batch(engine):
+    transactions = live_transactions(engine, 5, seed=1)
+    batch = engine.predict_fraud_batch(transactions)
+
+    assert [engine.predict_fraud(tx) for tx in transactions] == batch
+
+
+def test_check_drift_keeps_small_window(engine):
+    engine.predict_fraud_batch(live_transactions(engine, 100, seed=2, amount_shift=30))
+    report = engine.check_drift()
+
+    assert not report['window_complete']
+    assert engine.drift_monitor.live_sketches['amount'].total == 100
+
+    engine.predict_fraud_batch(live_transactions(engine, 500, seed=3, amount_shift=30))
+    report = engine.check_drift()
+
+    assert report['drift_detected']
+    assert 'amount' in report['drifted_columns']
+    assert engine.drift_monitor.live_sketches['amount'].total == 0
+
+
+def test_periodic_drift_check_from_scoring_path(engine):
+    engine.drift_check_interval = 600
+
+    engine.predict_fraud_batch(live_transactions(engine, 400, seed=4, amount_shift=30))
+    assert engine.last_drift_report is None
+
+    engine.predict_fraud_batch(live_transactions(engine, 400, seed=5, amount_shift=30))
+    assert engine.last_drift_report['drift_detected']
+    assert not engine.last_drift_report['retrained']
+
+
+def test_periodic_drift_check_retrains(engine, monkeypatch):
+    engine.drift_check_interval = 600
+    engine.retrain_on_drift = True
+    calls = []
+    monkeypatch.setattr(engine, 'train_models', lambda: calls.append(1) or {})
+
+    engine.predict_fraud_batch(live_transactions(engine, 800, seed=6, amount_shift=30))
+
+    assert calls == [1]
+    assert engine.last_drift_report['retrained']
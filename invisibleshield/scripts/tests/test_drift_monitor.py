@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from drift_monitor import SCORE_COLUMN, DriftMonitor, QuantileSketch
+
+COLUMNS = ['amount', 'velocity_score']
+
+
+def make_frame(rng, size, amount_mean=100.0):
+    return pd.DataFrame({
+        'amount': rng.normal(amount_mean, 20, size),
+        'velocity_score': rng.normal(25, 10, size)
+    })
+
+
+def make_monitor(rng):
+    reference = make_frame(rng, 20000)
+    return DriftMonitor.from_reference(reference, COLUMNS, scores=rng.beta(2, 5, 20000))
+
+
+def test_sketch_merge_matches_single_sketch():
+    rng = np.random.default_rng(0)
+    reference = QuantileSketch.from_reference(rng.normal(size=5000))
+    values = rng.normal(size=3000)
+
+    single = reference.empty_copy()
+    single.update(values)
+
+    left, right = reference.empty_copy(), reference.empty_copy()
+    left.update(values[:1000])
+    right.update(values[1000:])
+    left.merge(right)
+
+    assert np.array_equal(left.counts, single.counts)
+    assert left.total == single.total == 3000
+    assert left.min_value == single.min_value
+    assert left.max_value == single.max_value
+
+
+def test_sketch_merge_rejects_different_edges():
+    rng = np.random.default_rng(1)
+    first = QuantileSketch.from_reference(rng.normal(size=1000))
+    second = QuantileSketch.from_reference(rng.normal(5, 1, size=1000))
+
+    with pytest.raises(ValueError):
+        first.merge(second)
+
+
+def test_psi_and_ks_separate_same_and_shifted_distributions():
+    rng = np.random.default_rng(2)
+    reference = QuantileSketch.from_reference(rng.normal(size=20000))
+
+    same = reference.empty_copy()
+    same.update(rng.normal(size=5000))
+    shifted = reference.empty_copy()
+    shifted.update(rng.normal(1.0, 1, size=5000))
+
+    assert same.psi(reference) < 0.05
+    assert same.ks(reference) < 0.05
+    assert shifted.psi(reference) > 0.2
+    assert shifted.ks(reference) > 0.2
+
+
+def test_drift_report_does_not_flag_same_distribution():
+    rng = np.random.default_rng(3)
+    monitor = make_monitor(rng)
+
+    monitor.update(make_frame(rng, 5000), rng.beta(2, 5, 5000))
+    report = monitor.drift_report()
+
+    assert report['window_complete']
+    assert not report['drift_detected']
+    assert report['drifted_columns'] == []
+
+
+def test_drift_report_flags_shifted_feature():
+    rng = np.random.default_rng(4)
+    monitor = make_monitor(rng)
+
+    monitor.update(make_frame(rng, 5000, amount_mean=160.0), rng.beta(2, 5, 5000))
+    report = monitor.drift_report()
+
+    assert report['drift_detected']
+    assert report['drifted_columns'] == ['amount']
+    assert report['columns'][SCORE_COLUMN]['drifted'] is False
+
+
+def test_drift_report_waits_for_min_samples():
+    rng = np.random.default_rng(5)
+    monitor = make_monitor(rng)
+
+    monitor.update(make_frame(rng, 100, amount_mean=160.0))
+    report = monitor.drift_report()
+
+    assert not report['window_complete']
+    assert not report['drift_detected']
+
+
+def test_merged_worker_monitors_detect_drift():
+    rng = np.random.default_rng(6)
+    monitor = make_monitor(rng)
+    worker = DriftMonitor(monitor.reference_sketches)
+
+    monitor.update(make_frame(rng, 300, amount_mean=160.0))
+    worker.update(make_frame(rng, 300, amount_mean=160.0))
+    assert not monitor.drift_report()['drift_detected']
+
+    monitor.merge(worker)
+    report = monitor.drift_report()
+    assert report['live_samples'] == 600
+    assert report['drift_detected']
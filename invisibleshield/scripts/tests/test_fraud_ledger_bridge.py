@@ -0,0 +1,179 @@
+import threading
+import time
+
+import pytest
+
+from blockchain_trust_system import TrustPassportSystem
+from fraud_ledger_bridge import FraudLedgerBridge, map_prediction_to_ledger
+
+
+class FakeEngine:
+    """Deterministic stand-in for FraudDetectionEngine: risk follows velocity_score"""
+
+    feature_columns = ['amount', 'velocity_score']
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batch_sizes = []
+
+    def predict_fraud_batch(self, transactions):
+        time.sleep(self.delay)
+        self.batch_sizes.append(len(transactions))
+        return [self.predict_fraud(tx) for tx in transactions]
+
+    def predict_fraud(self, tx):
+        score = float(tx['velocity_score']) / 100
+        if score >= 0.8:
+            risk_level, recommendation = 'CRITICAL', 'BLOCK_TRANSACTION'
+        elif score >= 0.6:
+            risk_level, recommendation = 'HIGH', 'REQUIRE_ADDITIONAL_VERIFICATION'
+        elif score >= 0.4:
+            risk_level, recommendation = 'MEDIUM', 'FLAG_FOR_REVIEW'
+        else:
+            risk_level, recommendation = 'LOW', 'APPROVE'
+        return {'fraud_probability': score, 'risk_level': risk_level, 'is_anomaly': score >= 0.4,
+                'recommendation': recommendation}
+
+
+def raw_transaction(i, velocity_score=10.0, **overrides):
+    tx = {'customer_id': f'CUST-{i % 5}', 'merchant_id': f'M-{i:04d}', 'amount': 50.0,
+          'velocity_score': velocity_score}
+    tx.update(overrides)
+    return tx
+
+
+@pytest.fixture
+def trust_system(tmp_path):
+    system = TrustPassportSystem(str(tmp_path / 'ledger.db'))
+    system.difficulty = 1
+    return system
+
+
+def run_with_timeout(bridge, transactions, timeout=30):
+    """Run the bridge in a thread so a hang fails the test instead of blocking it"""
+    result = {}
+
+    def target():
+        try:
+            result['stats'] = bridge.run(transactions)
+        except Exception as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "bridge did not shut down"
+    return result
+
+
+def ledger_transactions(system):
+    mined = [tx for block in system.blockchain[1:] for tx in block.transactions]
+    return mined + system.pending_transactions
+
+
+def test_end_to_end_preserves_order_and_reports_stats(trust_system):
+    engine = FakeEngine()
+    bridge = FraudLedgerBridge(engine, trust_system, batch_size=16, block_size=50)
+
+    result = run_with_timeout(bridge, [raw_transaction(i) for i in range(200)])
+    stats = result['stats']
+
+    assert stats['processed_transactions'] == 200
+    assert stats['rejected_transactions'] == 0
+    assert stats['throughput_tps'] > 0
+    assert stats['scoring_latency']['count'] == 200
+    assert stats['ledger_latency']['count'] == 200
+    assert stats['end_to_end_latency']['count'] == 200
+    assert max(engine.batch_sizes) <= 16
+
+    assert [tx.merchant_id for tx in ledger_transactions(trust_system)] == [f'M-{i:04d}' for i in range(200)]
+    assert len(trust_system.blockchain) > 1
+    assert trust_system.verify_blockchain_integrity()
+    assert len(trust_system.get_customer_trust_history('CUST-0')) == 40
+
+
+def test_bad_records_are_rejected_without_dropping_the_batch(trust_system):
+    rejected = []
+
+    def on_reject(tx, stage, error):
+        rejected.append(stage)
+        raise ValueError("callback failure must not stop the pipeline")
+
+    bridge = FraudLedgerBridge(FakeEngine(), trust_system, batch_size=8, on_reject=on_reject)
+    transactions = [raw_transaction(i) for i in range(20)]
+    transactions[3] = None
+    del transactions[5]['velocity_score']
+    transactions[7]['velocity_score'] = 'not-a-number'
+    transactions[9]['fraud_indicators'] = None
+
+    result = run_with_timeout(bridge, transactions)
+
+    assert 'error' not in result
+    assert result['stats']['processed_transactions'] == 17
+    assert rejected == ['scoring', 'scoring', 'scoring']
+    assert [entry['transaction'] for entry in bridge.rejected_transactions][0] is None
+
+
+def test_prediction_maps_to_one_penalized_indicator(trust_system):
+    bridge = FraudLedgerBridge(FakeEngine(), trust_system)
+    run_with_timeout(bridge, [raw_transaction(0, velocity_score=70.0, verification_method='BIOMETRIC',
+                                              fraud_indicators=['new_device'])])
+
+    tx = trust_system.pending_transactions[0]
+    assert tx.fraud_indicators == ['new_device', 'high_fraud_risk', 'step_up_required']
+    assert tx.verification_method == 'BIOMETRIC'
+    # +1 normal amount, +3 biometric, -5 per penalized indicator (new_device, high_fraud_risk)
+    assert tx.trust_score_after - tx.trust_score_before == 1 + 3 - 10
+
+
+def test_low_risk_prediction_adds_no_indicators():
+    ledger_tx = map_prediction_to_ledger(raw_transaction(0), FakeEngine().predict_fraud(raw_transaction(0)))
+    assert ledger_tx['fraud_indicators'] == []
+
+
+def test_backpressure_with_small_queues(trust_system):
+    engine = FakeEngine(delay=0.01)
+    bridge = FraudLedgerBridge(engine, trust_system, batch_size=2, queue_size=4)
+
+    result = run_with_timeout(bridge, [raw_transaction(i) for i in range(60)])
+
+    assert result['stats']['processed_transactions'] == 60
+    assert max(engine.batch_sizes) <= 2
+
+
+def test_worker_failure_does_not_hang_and_is_raised_from_close(trust_system, monkeypatch):
+    bridge = FraudLedgerBridge(FakeEngine(), trust_system, batch_size=4, queue_size=8)
+
+    def failing_score(batch):
+        raise RuntimeError("scoring worker crashed")
+
+    monkeypatch.setattr(bridge, '_score', failing_score)
+    result = run_with_timeout(bridge, [raw_transaction(i) for i in range(100)])
+
+    assert isinstance(result['error'], RuntimeError)
+    assert bridge.transaction_ids == []
+    assert trust_system.pending_transactions == []
+
+
+def test_concurrent_add_and_mine_loses_no_transactions(trust_system):
+    done = threading.Event()
+
+    def producer():
+        for i in range(200):
+            trust_system.add_transaction(raw_transaction(i))
+        done.set()
+
+    def miner():
+        while not done.is_set():
+            trust_system.mine_block()
+
+    threads = [threading.Thread(target=producer), threading.Thread(target=miner)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+    trust_system.mine_block()
+
+    assert trust_system.pending_transactions == []
+    assert len(ledger_transactions(trust_system)) == 200
+    assert trust_system.verify_blockchain_integrity()
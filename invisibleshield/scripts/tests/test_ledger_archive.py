@@ -0,0 +1,143 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from blockchain_trust_system import TrustPassportSystem
+from ledger_archive import LedgerArchive, LedgerArchiveExporter
+
+
+def add_blocks(system, num_blocks, per_block=40, start=0):
+    for block in range(num_blocks):
+        system.add_transactions([
+            {'customer_id': f'CUST-{(start + block * per_block + i) % 37:03d}',
+             'merchant_id': f'M-{(start + block) % 4}',
+             'amount': float(i + 1),
+             'fraud_indicators': ['high_fraud_risk'] if i % 10 == 0 else []}
+            for i in range(per_block)
+        ])
+        system.mine_block()
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    system = TrustPassportSystem(str(tmp_path / 'ledger.db'))
+    system.difficulty = 1
+    add_blocks(system, 8)
+    return system
+
+
+@pytest.fixture
+def exporter(ledger, tmp_path):
+    return LedgerArchiveExporter(ledger.db_path, str(tmp_path / 'archive'), blocks_per_segment=3, row_group_size=32)
+
+
+def all_transaction_ids(system):
+    return sorted(tx.transaction_id for block in system.blockchain for tx in block.transactions)
+
+
+def test_export_is_incremental_and_complete(ledger, exporter):
+    first = exporter.export(max_blocks=4)
+    assert [(s['start_height'], s['end_height']) for s in first] == [(0, 2), (3, 3)]
+
+    rest = exporter.export()
+    assert [(s['start_height'], s['end_height']) for s in rest] == [(4, 6), (7, 8)]
+    assert exporter.export() == []
+
+    df = LedgerArchive(exporter.archive_dir).scan(['transaction_id', 'block_height'])
+    assert sorted(df['transaction_id']) == all_transaction_ids(ledger)
+    assert df['block_height'].max() == 8
+
+
+def test_export_survives_vacuum_and_clock_steps(ledger, exporter):
+    exporter.export()
+
+    # Reorder physical rows: copy the table in reverse and VACUUM so rowids change
+    conn = sqlite3.connect(ledger.db_path)
+    conn.execute('CREATE TABLE blocks_copy AS SELECT * FROM blocks ORDER BY rowid DESC')
+    conn.execute('DELETE FROM blocks')
+    conn.execute('INSERT INTO blocks SELECT * FROM blocks_copy')
+    conn.execute('DROP TABLE blocks_copy')
+    conn.commit()
+    conn.execute('VACUUM')
+    conn.close()
+
+    add_blocks(ledger, 2, start=100)
+    conn = sqlite3.connect(ledger.db_path)
+    conn.execute("UPDATE blocks SET timestamp = '2000-01-01T00:00:00' WHERE block_id = ?",
+                 (ledger.blockchain[-1].block_id,))
+    conn.commit()
+    conn.close()
+
+    new_segments = exporter.export()
+    assert [(s['start_height'], s['end_height']) for s in new_segments] == [(9, 10)]
+
+    df = LedgerArchive(exporter.archive_dir).scan(['transaction_id'])
+    assert df['transaction_id'].is_unique
+    assert sorted(df['transaction_id']) == all_transaction_ids(ledger)
+
+
+def test_scan_matches_full_filter(ledger, exporter):
+    exporter.export()
+    archive = LedgerArchive(exporter.archive_dir)
+    everything = archive.scan()
+
+    result = archive.scan(['transaction_id', 'amount'], customer_id='CUST-005', merchant_id='M-1')
+    expected = everything[(everything['customer_id'] == 'CUST-005') & (everything['merchant_id'] == 'M-1')]
+
+    assert list(result.columns) == ['transaction_id', 'amount']
+    assert sorted(result['transaction_id']) == sorted(expected['transaction_id'])
+
+    cutoff = np.sort(everything['timestamp'].to_numpy())[150]
+    by_time = archive.scan(['timestamp'], start_time=str(cutoff))
+    assert len(by_time) == int((everything['timestamp'] >= cutoff).sum())
+
+
+def test_customer_predicate_prunes_row_groups(ledger, exporter):
+    exporter.export()
+    archive = LedgerArchive(exporter.archive_dir)
+
+    archive.scan(['amount'])
+    total_row_groups = archive.last_scan_stats['row_groups_read']
+
+    result = archive.scan(['amount'], customer_id='CUST-010')
+    assert len(result) > 0
+    # Each 120-row segment holds ~3 rows per customer, clustered into one row group
+    assert archive.last_scan_stats['row_groups_read'] <= archive.last_scan_stats['segments_read'] * 2
+    assert archive.last_scan_stats['row_groups_read'] < total_row_groups / 2
+
+
+def test_merchant_and_height_predicates_prune_row_groups(ledger, exporter):
+    exporter.export()
+    archive = LedgerArchive(exporter.archive_dir)
+
+    # Merchants change per block; only row groups whose distinct set contains M-2
+    # (blocks at heights 3 and 7) are read, so the first segment is skipped entirely
+    result = archive.scan(['merchant_id'], merchant_id='M-2')
+    assert set(result['merchant_id']) == {'M-2'}
+    assert len(result) == 80
+    assert archive.last_scan_stats['segments_total'] == 3
+    assert archive.last_scan_stats['segments_read'] == 2
+
+    # Only the segment covering heights 3-5 is opened; height stats are also checked per row group
+    result = archive.scan(['block_height'], min_height=4, max_height=4)
+    assert set(result['block_height']) == {4}
+    assert len(result) == 40
+    assert archive.last_scan_stats['segments_read'] == 1
+    assert archive.last_scan_stats['rows_read'] <= 120
+
+
+def test_row_group_height_stats_prune(tmp_path):
+    system = TrustPassportSystem(str(tmp_path / 'ledger.db'))
+    system.difficulty = 1
+    # One customer per block keeps the customer-sorted rows in height order
+    for block in range(4):
+        system.add_transactions([{'customer_id': f'CUST-{block}', 'amount': 5.0} for _ in range(32)])
+        system.mine_block()
+    exporter = LedgerArchiveExporter(system.db_path, str(tmp_path / 'archive'), row_group_size=32)
+    exporter.export()
+
+    archive = LedgerArchive(exporter.archive_dir)
+    result = archive.scan(['block_height'], min_height=2, max_height=2)
+    assert len(result) == 32
+    assert archive.last_scan_stats['row_groups_read'] <= 2